@@ -13,20 +13,31 @@ projections in the
 This package provides both C and CUDA implementations of core
 functionality, but note that use of the CUDA/GPU implementation is
 expected to result in GPU-host-GPU memory copies when transferring
-JAX arrays. Other JAX features such as automatic differentiation are
-not available.
+JAX arrays. The ASTRA calls are made via :func:`jax.pure_callback`,
+so that the projector can be used within jitted functions, with the
+calls dispatched asynchronously with respect to the surrounding
+computation. Since the callbacks are pure, a projection whose result
+is unused may be eliminated, and identical projections may be merged,
+when compiled by XLA. Reverse-mode automatic differentiation is
+supported, but other JAX features such as forward-mode automatic
+differentiation are not available.
 """
 
 
-from typing import List, Optional
+import threading
+import weakref
+from functools import lru_cache, partial
+from typing import Any, Dict, List, Optional
 
 import numpy as np
 
 import jax
-import jax.experimental.host_callback as hcb
+
+from scipy.signal import lfilter
 
 try:
     import astra
+    import astra.experimental
 except ModuleNotFoundError as e:
     if e.name == "astra":
         new_e = ModuleNotFoundError("Could not import astra; please install the ASTRA toolbox.")
@@ -35,11 +46,26 @@ except ModuleNotFoundError as e:
     else:
         raise e
 
+try:
+    import cupy
+except ImportError:
+    have_cupy = False
+else:
+    have_cupy = True
+
 
 from scico.typing import Shape
 
 from ._linop import LinearOperator
 
+# Gains c_k and poles a_k of the recursive approximation of the Ram-Lak
+# filter kernel used by _ramp_iir (least squares fit of the frequency
+# response of the approximation to the ramp).
+_RAMP_IIR_GAIN = np.array(
+    [-4.1929838071e-01, -2.2466995575e-02, -1.5364877069e-03, -5.2542824977e-05, -8.1237376368e-07]
+)
+_RAMP_IIR_POLE = np.array([0.2026200633, 0.6639496118, 0.9067509341, 0.9842487055, 0.9982892878])
+
 
 class TomographicProjector(LinearOperator):
     r"""Parallel beam Radon transform based on the ASTRA toolbox.
@@ -59,8 +85,19 @@ class TomographicProjector(LinearOperator):
         device: str = "auto",
     ):
         """
+        The output of this linear operator is an array of shape
+        `(num_angles, det_count)` when `input_shape` is 2D, or of shape
+        `(num_slices, num_angles, det_count)` when `input_shape` is 3D,
+        where `num_angles` is the length of the `angles` argument. In the
+        3D case, all slices are projected with a single ASTRA 3D parallel
+        beam projection when the GPU is used, and slice by slice with the
+        2D projector otherwise.
+
         Args:
-            input_shape: Shape of the input array.
+            input_shape: Shape of the input array. May be of length 2 (a
+               2D array of shape `(rows, cols)`) or 3 (a stack of 2D
+               slices of shape `(num_slices, rows, cols)`, each slice
+               being a plane perpendicular to the axis of rotation).
             detector_spacing: Spacing between detector elements.
             det_count: Number of detector elements.
             angles: Array of projection angles in radians.
@@ -84,19 +121,32 @@ class TomographicProjector(LinearOperator):
         """
 
         # Set up all the ASTRA config
-        self.detector_spacing: float = detector_spacing
-        self.det_count: int = det_count
-        self.angles: np.ndarray = np.array(angles)
+        self.detector_spacing: float = float(detector_spacing)
+        self.det_count: int = int(det_count)
+        self.angles: np.ndarray = np.asarray(angles, dtype=np.float32)
 
-        self.proj_geom: dict = astra.create_proj_geom(
-            "parallel", detector_spacing, det_count, self.angles
+        self.proj_geom: dict = _cached_proj_geom(
+            "parallel", self.angles.tobytes(), self.detector_spacing, self.det_count
         )
         self.proj_id: int
         self.input_shape: tuple = input_shape
 
+        if len(input_shape) == 2:  # 2D input
+            self.num_slices: Optional[int] = None
+            slice_shape = input_shape
+            output_shape: tuple = (len(self.angles), self.det_count)
+        elif len(input_shape) == 3:  # 3D input
+            self.num_slices = input_shape[0]
+            slice_shape = input_shape[1:]
+            output_shape = (self.num_slices, len(self.angles), self.det_count)
+        else:
+            raise ValueError(
+                f"Only 2D and 3D inputs are supported, but input_shape was {input_shape}."
+            )
+
         if volume_geometry is not None:
             if len(volume_geometry) == 4:
-                self.vol_geom: dict = astra.create_vol_geom(*input_shape, *volume_geometry)
+                self.vol_geom: dict = _cached_vol_geom(*slice_shape, *map(float, volume_geometry))
             else:
                 raise ValueError(
                     "volume_geometry must be the shape of the volume as a tuple of len 4 "
@@ -104,98 +154,576 @@ class TomographicProjector(LinearOperator):
                     "for details."
                 )
         else:
-            self.vol_geom = astra.create_vol_geom(*input_shape)
+            self.vol_geom = _cached_vol_geom(*slice_shape)
+
+        # ASTRA objects used by this projector, which are released when
+        # it is garbage collected
+        self._astra_objs: dict = {
+            "projector_keys": [],
+            "proj_ctx": None,
+            "fbp_ctx": None,
+            "buffers": [],
+        }
+        weakref.finalize(self, _release_astra_objects, self._astra_objs)
+
+        # Host-side methods are called via jax.pure_callback. Since JAX
+        # caches the callbacks, these reach this object only via a weak
+        # reference (see _call_host), so that they do not keep it alive.
+        # The callbacks are jitted so that, once compiled for a given
+        # method and result shape, they are reused by subsequent calls.
+        self._ref = weakref.ref(self)
+        self._host_fn = jax.jit(
+            partial(_host_callback, self._ref),
+            static_argnums=(0, 1),
+            static_argnames="filter_type",
+        )
 
         dev0 = jax.devices()[0]
         if dev0.platform == "cpu" or device == "cpu":
-            self.proj_id = astra.create_projector("line", self.proj_geom, self.vol_geom)
+            self.device: str = "cpu"
+            self.proj_id = self._acquire_projector("line", self.proj_geom, self.vol_geom)
         elif dev0.platform == "gpu" and device in ["gpu", "auto"]:
-            self.proj_id = astra.create_projector("cuda", self.proj_geom, self.vol_geom)
+            self.device = "gpu"
+            self.proj_id = self._acquire_projector("cuda", self.proj_geom, self.vol_geom)
         else:
             raise ValueError(f"Invalid device specified; got {device}.")
 
-        # Wrap our non-jax function to indicate we will supply fwd/rev mode functions
-        self._eval = jax.custom_vjp(self._proj)
-        self._eval.defvjp(lambda x: (self._proj(x), None), lambda _, y: (self._bproj(y),))  # type: ignore
-        self._adj = jax.custom_vjp(self._bproj)
-        self._adj.defvjp(lambda y: (self._bproj(y), None), lambda _, x: (self._proj(x),))  # type: ignore
-
+        # For 3D input on the GPU, project all slices at once using the
+        # equivalent 3D parallel beam geometry
+        self.proj_id_3d: Optional[int] = None
+        if self.num_slices is not None and self.device == "gpu":
+            vol_window = [
+                self.vol_geom["option"][k]
+                for k in ("WindowMinX", "WindowMaxX", "WindowMinY", "WindowMaxY")
+            ]
+            self.vol_geom_3d: dict = _cached_vol_geom(
+                *slice_shape,
+                self.num_slices,
+                *vol_window,
+                -self.num_slices / 2,
+                self.num_slices / 2,
+            )
+            self.proj_geom_3d: dict = _cached_proj_geom(
+                "parallel3d",
+                self.angles.tobytes(),
+                self.detector_spacing,
+                1.0,
+                self.num_slices,
+                self.det_count,
+            )
+            self.proj_id_3d = self._acquire_projector("cuda3d", self.proj_geom_3d, self.vol_geom_3d)
+
+        # Owned staging buffers for the callback inputs, which are pinned
+        # when the GPU is used; access to these and to the cached ASTRA
+        # objects is serialized by self._lock. Unless all slices of 3D
+        # input are projected at once, these are single slice buffers.
+        pinned = self.device == "gpu"
+        if self.proj_id_3d is None:
+            buf_shapes = (slice_shape, output_shape[-2:])
+        else:
+            buf_shapes = (input_shape, output_shape)
+        self._vol_buf = _empty_host_buffer(buf_shapes[0], pinned=pinned)
+        self._sino_buf = _empty_host_buffer(buf_shapes[1], pinned=pinned)
+        # The buffers are owned by the ASTRA objects record so that they
+        # outlive any ASTRA data linked to them, and are freed (returning
+        # pinned memory to the cupy pool) once that data is deleted
+        self._astra_objs["buffers"] = [self._vol_buf, self._sino_buf]
+        self._lock = threading.Lock()
+
+        # When using the 2D projector, the projection and back projection
+        # algorithms are created once, operating on ASTRA data linked to
+        # the buffers, and are deleted when this object is garbage
+        # collected
+        self._proj_ctx: Optional[dict] = None
+        if self.proj_id_3d is None:
+            self._proj_ctx = _create_proj_context(
+                self.proj_id, self.proj_geom, self.vol_geom, self._vol_buf, self._sino_buf
+            )
+            self._astra_objs["proj_ctx"] = self._proj_ctx
+
+        # ASTRA objects for FBP are created on first use of self.fbp
+        self._fbp_ctx: Optional[dict] = None
+
+        # Projection and back projection are each other's vjp; see the
+        # module-level custom_vjp functions below
+        self._eval = partial(_project, self)
+
+        # Not jitted: tracing the custom_vjp functions within jax.jit
+        # stores this object, as a nondiff argument, in JAX's tracing
+        # caches, which would then keep it alive indefinitely
         super().__init__(
             input_shape=self.input_shape,
-            output_shape=(len(angles), det_count),
+            output_shape=output_shape,
             input_dtype=np.float32,
             output_dtype=np.float32,
-            adj_fn=self._adj,
+            adj_fn=partial(_back_project, self),
             jit=False,
         )
 
-    def _proj(self, x: jax.Array) -> jax.Array:
-        # Applies the forward projector and generates a sinogram
+    def _acquire_projector(self, kind: str, proj_geom: dict, vol_geom: dict) -> int:
+        """Get a shared ASTRA projector for the lifetime of this object.
 
-        def f(x):
-            if x.flags.writeable == False:
-                x.flags.writeable = True
-            proj_id, result = astra.create_sino(x, self.proj_id)
-            astra.data2d.delete(proj_id)
-            return result
+        Args:
+            kind: ASTRA projector type.
+            proj_geom: ASTRA projection geometry.
+            vol_geom: ASTRA volume geometry.
 
-        return hcb.call(
-            f, x, result_shape=jax.ShapeDtypeStruct(self.output_shape, self.output_dtype)
+        Returns:
+            ASTRA projector id.
+        """
+        key = (kind, _geom_key(proj_geom), _geom_key(vol_geom))
+        self._astra_objs["projector_keys"].append(key)
+        return _acquire_projector(key, proj_geom, vol_geom)
+
+    def _proj(self, x: jax.Array) -> jax.Array:
+        # Applies the forward projector and generates a sinogram
+        return self._host_fn(
+            "_proj_host", jax.ShapeDtypeStruct(self.output_shape, self.output_dtype), x
         )
 
     def _bproj(self, y: jax.Array) -> jax.Array:
         # applies backprojector
-        def f(y):
-            if y.flags.writeable == False:
-                y.flags.writeable = True
-            proj_id, result = astra.create_backprojection(y, self.proj_id)
-            astra.data2d.delete(proj_id)
-            return result
+        return self._host_fn(
+            "_bproj_host", jax.ShapeDtypeStruct(self.input_shape, self.input_dtype), y
+        )
 
-        return hcb.call(f, y, result_shape=jax.ShapeDtypeStruct(self.input_shape, self.input_dtype))
+    def _proj_host(self, x: np.ndarray) -> np.ndarray:
+        # Host-side forward projection, via pure_callback
+        with self._lock:
+            if self.proj_id_3d is not None:
+                np.copyto(self._vol_buf, x)
+                y = np.zeros(self.output_shape, dtype=np.float32)
+                astra.experimental.direct_FP3D(self.proj_id_3d, self._vol_buf, y)
+                return y
+            y = np.empty(x.shape[:-2] + self._sino_buf.shape, dtype=np.float32)
+            for xk, yk in zip(
+                x.reshape((-1,) + self._vol_buf.shape), y.reshape((-1,) + self._sino_buf.shape)
+            ):
+                np.copyto(self._vol_buf, xk)
+                astra.algorithm.run(self._proj_ctx["fp_alg_id"])  # type: ignore
+                np.copyto(yk, self._sino_buf)
+            return y
+
+    def _bproj_host(self, y: np.ndarray) -> np.ndarray:
+        # Host-side back projection, via pure_callback
+        with self._lock:
+            if self.proj_id_3d is not None:
+                np.copyto(self._sino_buf, y)
+                x = np.zeros(self.input_shape, dtype=np.float32)
+                astra.experimental.direct_BP3D(self.proj_id_3d, x, self._sino_buf)
+                return x
+            x = np.empty(y.shape[:-2] + self._vol_buf.shape, dtype=np.float32)
+            for yk, xk in zip(
+                y.reshape((-1,) + self._sino_buf.shape), x.reshape((-1,) + self._vol_buf.shape)
+            ):
+                np.copyto(self._sino_buf, yk)
+                astra.algorithm.run(self._proj_ctx["bp_alg_id"])  # type: ignore
+                np.copyto(xk, self._vol_buf)
+            return x
+
+    def _batch_proj_host(self, xs: np.ndarray) -> np.ndarray:
+        # Host-side forward projection of a batch of inputs
+        if self.proj_id_3d is None:
+            # The slice loop in _proj_host runs over all leading axes
+            return self._proj_host(xs)
+        return np.stack([self._proj_host(x) for x in xs])
+
+    def batch_apply(self, xs: jax.Array) -> jax.Array:
+        """Apply the projector to a batch of inputs.
+
+        Compute the projections of a stack of inputs within a single
+        host callback, avoiding the fixed cost of a separate callback
+        for each input. Unlike application of the operator itself, this
+        method does not support automatic differentiation.
+
+        Args:
+            xs: Array of shape `(B,) + input_shape`, consisting of `B`
+               stacked inputs.
+
+        Returns:
+            Array of shape `(B,) + output_shape` of projections of the
+            inputs.
+        """
+        if xs.shape[1:] != self.input_shape:
+            raise ValueError(f"Shape of xs must be (B,) + {self.input_shape}; got {xs.shape}.")
+        return self._host_fn(
+            "_batch_proj_host",
+            jax.ShapeDtypeStruct(xs.shape[:1] + self.output_shape, self.output_dtype),
+            xs,
+        )
 
     def fbp(self, sino: jax.Array, filter_type: str = "Ram-Lak") -> jax.Array:
         """Filtered back projection (FBP) reconstruction.
 
         Perform tomographic reconstruction using the filtered back
-        projection (FBP) algorithm.
+        projection (FBP) algorithm. The ASTRA `FBP_CUDA` algorithm is
+        used when the projector is on the GPU, and the `FBP` algorithm
+        is used otherwise. For 3D input, each slice is reconstructed
+        independently.
 
         Args:
             sino: Sinogram to reconstruct.
             filter_type: Select the filter to use. For a list of options
                see `cfg.FilterType` in the `ASTRA documentation
                <https://www.astra-toolbox.com/docs/algs/FBP_CUDA.html>`__.
+               In addition, "Ram-Lak-IIR" selects a recursive (IIR)
+               approximation of the "Ram-Lak" filter that is applied to
+               the sinogram before running the ASTRA FBP algorithm
+               without filtering.
         """
 
-        # Just use the CPU FBP alg for now; hitting memory issues with GPU one.
-        def f(sino):
-            if sino.flags.writeable == False:
-                sino.flags.writeable = True
-            proj_id = astra.create_projector("line", self.proj_geom, self.vol_geom)
-            sino_id = astra.data2d.create("-sino", self.proj_geom, sino)
-
-            # create memory for result
-            rec_id = astra.data2d.create("-vol", self.vol_geom)
-
-            # start to populate config
-            cfg = astra.astra_dict("FBP")
-            cfg["ReconstructionDataId"] = rec_id
-            cfg["ProjectorId"] = proj_id
-            cfg["ProjectionDataId"] = sino_id
+        return self._host_fn(
+            "_fbp_host",
+            jax.ShapeDtypeStruct(self.input_shape, self.input_dtype),
+            sino,
+            filter_type=filter_type,
+        )
+
+    def _fbp_host(self, sino: np.ndarray, filter_type: str) -> np.ndarray:
+        # Host-side FBP reconstruction, via pure_callback
+        if filter_type == "Ram-Lak-IIR":
+            sino = _ramp_iir(sino)
+            astra_filter_type = "none"
+        else:
+            astra_filter_type = filter_type
+        with self._lock:
+            ctx = self._fbp_context(astra_filter_type)
+
+            def fbp_slice(sino):
+                astra.data2d.store(ctx["sino_id"], sino)
+                astra.algorithm.run(ctx["alg_id"])
+                return astra.data2d.get(ctx["rec_id"])
+
+            if self.num_slices is None:
+                return fbp_slice(sino)
+            return np.stack([fbp_slice(sino[k]) for k in range(self.num_slices)])
+
+    def _fbp_context(self, filter_type: str) -> dict:
+        """Get the cached ASTRA objects used by :meth:`fbp`.
+
+        The data objects are created on the first call and reused
+        thereafter. The algorithm object is only rebuilt when
+        `filter_type` differs from that of the previous call.
+
+        Args:
+            filter_type: FBP filter type.
+
+        Returns:
+            Dict of ASTRA object ids.
+        """
+        ctx = self._fbp_ctx
+        if ctx is None:
+            ctx = {
+                "sino_id": astra.data2d.create("-sino", self.proj_geom),
+                "rec_id": astra.data2d.create("-vol", self.vol_geom),
+                "alg_id": None,
+                "filter_type": None,
+            }
+            self._fbp_ctx = ctx
+            self._astra_objs["fbp_ctx"] = ctx
+        if ctx["filter_type"] != filter_type:
+            if ctx["alg_id"] is not None:
+                astra.algorithm.delete(ctx["alg_id"])
+                ctx["alg_id"] = None
+            cfg = astra.astra_dict("FBP_CUDA" if self.device == "gpu" else "FBP")
+            cfg["ProjectorId"] = self.proj_id
+            cfg["ReconstructionDataId"] = ctx["rec_id"]
+            cfg["ProjectionDataId"] = ctx["sino_id"]
             cfg["option"] = {"FilterType": filter_type}
+            ctx["alg_id"] = astra.algorithm.create(cfg)
+            ctx["filter_type"] = filter_type
+        return ctx
 
-            # initialize algorithm; run
-            alg_id = astra.algorithm.create(cfg)
-            astra.algorithm.run(alg_id)
 
-            # get the result
-            out = astra.data2d.get(rec_id)
+@partial(jax.custom_vjp, nondiff_argnums=(0,))
+def _project(A: TomographicProjector, x: jax.Array) -> jax.Array:
+    """Apply the forward projector of `A`, with back projection as vjp."""
+    return A._proj(x)
 
-            # cleanup FBP-specific arra
-            astra.algorithm.delete(alg_id)
-            astra.data2d.delete(rec_id)
-            return out
 
-        return hcb.call(
-            f, sino, result_shape=jax.ShapeDtypeStruct(self.input_shape, self.input_dtype)
-        )
+_project.defvjp(lambda A, x: (A._proj(x), None), lambda A, _, y: (A._bproj(y),))
+
+
+@partial(jax.custom_vjp, nondiff_argnums=(0,))
+def _back_project(A: TomographicProjector, y: jax.Array) -> jax.Array:
+    """Apply the back projector of `A`, with projection as vjp."""
+    return A._bproj(y)
+
+
+_back_project.defvjp(lambda A, y: (A._bproj(y), None), lambda A, _, x: (A._proj(x),))
+
+
+def _host_callback(
+    ref: weakref.ref, method: str, result_shape: jax.ShapeDtypeStruct, *args, **kwargs
+) -> jax.Array:
+    """Evaluate a host-side method of a projector via :func:`jax.pure_callback`.
+
+    Args:
+        ref: Weak reference to a :class:`TomographicProjector`.
+        method: Name of the method to call.
+        result_shape: Shape and dtype of the result of the method.
+        *args: Array arguments of the method.
+        **kwargs: Static keyword arguments of the method.
+
+    Returns:
+        Result of the method call.
+    """
+    return jax.pure_callback(partial(_call_host, ref, method, **kwargs), result_shape, *args)
+
+
+def _call_host(ref: weakref.ref, method: str, *args, **kwargs) -> np.ndarray:
+    """Call a host-side method of a weakly referenced projector.
+
+    Args:
+        ref: Weak reference to a :class:`TomographicProjector`.
+        method: Name of the method to call.
+        *args: Positional arguments of the method.
+        **kwargs: Keyword arguments of the method.
+
+    Returns:
+        Result of the method call.
+    """
+    A = ref()
+    if A is None:
+        raise RuntimeError("The TomographicProjector has been garbage collected.")
+    return getattr(A, method)(*args, **kwargs)
+
+
+# Shared ASTRA projectors, as a map from a key identifying the projector
+# type and geometries to a list containing the projector id and the
+# number of TomographicProjector objects using it
+_PROJECTOR_CACHE: Dict[tuple, List[int]] = {}
+_PROJECTOR_CACHE_LOCK = threading.Lock()
+
+# Keys of projectors whose release is pending. Since projectors are
+# released by weakref finalizers, which may be run by the garbage
+# collector at any allocation, including while _PROJECTOR_CACHE_LOCK is
+# held by the same thread, releases are queued here and only processed
+# when the lock can be acquired without blocking.
+_PENDING_RELEASE: List[tuple] = []
+
+
+def _geom_key(geom: Any) -> Any:
+    """Construct a hashable key representing an ASTRA geometry.
+
+    Args:
+        geom: ASTRA geometry dict, or a value within one.
+
+    Returns:
+        Hashable representation of `geom`.
+    """
+    if isinstance(geom, dict):
+        return tuple(sorted((k, _geom_key(v)) for k, v in geom.items()))
+    if isinstance(geom, np.ndarray):
+        return (geom.dtype.str, geom.shape, geom.tobytes())
+    return geom
+
+
+def _acquire_projector(key: tuple, proj_geom: dict, vol_geom: dict) -> int:
+    """Get a shared ASTRA projector, creating it if necessary.
+
+    Each call must be matched by a call to :func:`_release_projector`
+    with the same key.
+
+    Args:
+        key: Key, as constructed in
+           :meth:`TomographicProjector._acquire_projector`.
+        proj_geom: ASTRA projection geometry.
+        vol_geom: ASTRA volume geometry.
+
+    Returns:
+        ASTRA projector id.
+    """
+    with _PROJECTOR_CACHE_LOCK:
+        entry = _PROJECTOR_CACHE.get(key)
+        if entry is None:
+            entry = [astra.create_projector(key[0], proj_geom, vol_geom), 0]
+            _PROJECTOR_CACHE[key] = entry
+        entry[1] += 1
+    # Process any releases queued while the lock was held
+    _release_pending_projectors()
+    return entry[0]
+
+
+def _release_projector(key: tuple):
+    """Release a shared ASTRA projector, deleting it if no longer used.
+
+    Args:
+        key: Key used in the corresponding call to
+           :func:`_acquire_projector`.
+    """
+    _PENDING_RELEASE.append(key)
+    _release_pending_projectors()
+
+
+def _release_pending_projectors():
+    """Process the projector releases queued by :func:`_release_projector`.
+
+    The queue is left unchanged if :data:`_PROJECTOR_CACHE_LOCK` is held,
+    in which case it is processed by the holder of the lock on exiting
+    :func:`_acquire_projector` or :func:`_release_projector`.
+    """
+    while _PENDING_RELEASE and _PROJECTOR_CACHE_LOCK.acquire(blocking=False):
+        try:
+            while _PENDING_RELEASE:
+                key = _PENDING_RELEASE.pop()
+                entry = _PROJECTOR_CACHE[key]
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del _PROJECTOR_CACHE[key]
+                    if key[0] == "cuda3d":
+                        astra.projector3d.delete(entry[0])
+                    else:
+                        astra.projector.delete(entry[0])
+        finally:
+            _PROJECTOR_CACHE_LOCK.release()
+
+
+@lru_cache(maxsize=64)
+def _cached_proj_geom(geom_type: str, angles_bytes: bytes, *args) -> dict:
+    """Construct an ASTRA projection geometry, with caching.
+
+    Args:
+        geom_type: ASTRA projection geometry type.
+        angles_bytes: Raw bytes of a float32 array of projection angles.
+        *args: Geometry parameters preceding the angles in the
+           arguments of :func:`astra.create_proj_geom`.
+
+    Returns:
+        ASTRA projection geometry. Note that this object is shared
+        between calls with the same arguments, and should not be
+        modified.
+    """
+    angles = np.frombuffer(angles_bytes, dtype=np.float32)
+    return astra.create_proj_geom(geom_type, *args, angles)
+
+
+@lru_cache(maxsize=64)
+def _cached_vol_geom(*args) -> dict:
+    """Construct an ASTRA volume geometry, with caching.
+
+    Args:
+        *args: Arguments of :func:`astra.create_vol_geom`.
+
+    Returns:
+        ASTRA volume geometry. Note that this object is shared between
+        calls with the same arguments, and should not be modified.
+    """
+    return astra.create_vol_geom(*args)
+
+
+def _create_proj_context(
+    proj_id: int, proj_geom: dict, vol_geom: dict, vol_buf: np.ndarray, sino_buf: np.ndarray
+) -> dict:
+    """Create ASTRA projection and back projection algorithm objects.
+
+    Create ASTRA data objects linked to the specified volume and
+    sinogram buffers, and forward and back projection algorithm objects
+    operating on them, using the CUDA algorithms if `proj_id` is a CUDA
+    projector.
+
+    Args:
+        proj_id: ASTRA 2D projector id.
+        proj_geom: ASTRA projection geometry.
+        vol_geom: ASTRA volume geometry.
+        vol_buf: Volume buffer (C-contiguous float32 array).
+        sino_buf: Sinogram buffer (C-contiguous float32 array).
+
+    Returns:
+        Dict of ASTRA object ids.
+    """
+    vol_id = astra.data2d.link("-vol", vol_geom, vol_buf)
+    sino_id = astra.data2d.link("-sino", proj_geom, sino_buf)
+    suffix = "_CUDA" if astra.projector.is_cuda(proj_id) else ""
+    fp_cfg = astra.astra_dict("FP" + suffix)
+    fp_cfg["ProjectorId"] = proj_id
+    fp_cfg["VolumeDataId"] = vol_id
+    fp_cfg["ProjectionDataId"] = sino_id
+    bp_cfg = astra.astra_dict("BP" + suffix)
+    bp_cfg["ProjectorId"] = proj_id
+    bp_cfg["ReconstructionDataId"] = vol_id
+    bp_cfg["ProjectionDataId"] = sino_id
+    return {
+        "vol_id": vol_id,
+        "sino_id": sino_id,
+        "fp_alg_id": astra.algorithm.create(fp_cfg),
+        "bp_alg_id": astra.algorithm.create(bp_cfg),
+    }
+
+
+def _delete_proj_context(ctx: dict):
+    """Delete the ASTRA objects created by :func:`_create_proj_context`."""
+    astra.algorithm.delete([ctx["fp_alg_id"], ctx["bp_alg_id"]])
+    astra.data2d.delete([ctx["vol_id"], ctx["sino_id"]])
+
+
+def _delete_fbp_context(ctx: dict):
+    """Delete the ASTRA objects in a :meth:`TomographicProjector.fbp` context."""
+    if ctx["alg_id"] is not None:
+        astra.algorithm.delete(ctx["alg_id"])
+    astra.data2d.delete([ctx["sino_id"], ctx["rec_id"]])
+
+
+def _release_astra_objects(objs: dict):
+    """Release the ASTRA objects used by a :class:`TomographicProjector`."""
+    if objs["fbp_ctx"] is not None:
+        _delete_fbp_context(objs["fbp_ctx"])
+    if objs["proj_ctx"] is not None:
+        _delete_proj_context(objs["proj_ctx"])
+    objs["buffers"].clear()
+    for key in objs["projector_keys"]:
+        _release_projector(key)
+
+
+def _empty_host_buffer(shape: Shape, pinned: bool = False) -> np.ndarray:
+    """Allocate an uninitialized float32 host array.
+
+    Args:
+        shape: Shape of the array.
+        pinned: If ``True`` and cupy is installed, the array is allocated
+           in page-locked (pinned) host memory from the default cupy
+           pinned memory pool, allowing faster transfers to and from the
+           GPU. The memory is returned to the pool when the array is
+           garbage collected.
+
+    Returns:
+        Allocated array.
+    """
+    if pinned and have_cupy:
+        size = int(np.prod(shape))
+        mem = cupy.cuda.alloc_pinned_memory(size * np.dtype(np.float32).itemsize)
+        return np.frombuffer(mem, dtype=np.float32, count=size).reshape(shape)
+    return np.empty(shape, dtype=np.float32)
+
+
+def _ramp_iir(sino: np.ndarray) -> np.ndarray:
+    r"""Apply a recursive approximation of the Ram-Lak filter to a sinogram.
+
+    Filter each row of the sinogram with an infinite impulse response
+    (IIR) approximation of the Ram-Lak ramp filter. The off-center taps
+    :math:`h_n = -1 / (\pi n)^2`, :math:`n` odd, of the Ram-Lak kernel
+    are approximated by :math:`\sum_k c_k a_k^{|n|}`, :math:`n` odd,
+    so that the filter can be applied as a sum of causal and
+    anti-causal second order recursive filters, each with real poles at
+    :math:`\pm a_k`. The central tap is chosen so that the filter has a
+    zero DC response. The result is scaled so that reconstruction with
+    a "none" ASTRA filter type approximates reconstruction with the
+    ASTRA "Ram-Lak" filter.
+
+    Args:
+        sino: Sinogram with detector elements along the last axis.
+
+    Returns:
+        Filtered sinogram.
+    """
+    sino = np.asarray(sino, dtype=np.float64)
+    gain, pole = _RAMP_IIR_GAIN, _RAMP_IIR_POLE
+    out = -2.0 * np.sum(gain * pole / (1.0 - pole**2)) * sino
+    sino_rev = sino[..., ::-1]
+    for c, a in zip(gain, pole):
+        b = [0.0, c * a]
+        den = [1.0, 0.0, -(a**2)]
+        out += lfilter(b, den, sino, axis=-1)
+        out += lfilter(b, den, sino_rev, axis=-1)[..., ::-1]
+    # ASTRA's Ram-Lak filter is scaled by a factor of two
+    return (2.0 * out).astype(np.float32)
@@ -20,6 +20,13 @@ def testobj():
     yield SetupTest()
 
 
+# Evaluation is configured as parallel operation
+p_eval_step = jax.pmap(
+    functools.partial(eval_step, criterion=mse_loss, metrics_fn=compute_metrics),
+    axis_name="batch",
+)
+
+
 def test_basic_train_step(testobj):
     key = jax.random.PRNGKey(seed=531)
     key1, key2 = jax.random.split(key)
@@ -122,7 +129,6 @@ def test_basic_eval_step(testobj):
     input_shape = (1, testobj.N, testobj.N, testobj.chn)
     learning_rate = create_cnst_lr_schedule(testobj.train_conf)
     state = create_basic_train_state(key1, testobj.train_conf, model, input_shape, learning_rate)
-    criterion = mse_loss
 
     local_batch_size = testobj.train_conf["batch_size"] // jax.process_count()
     size_device_prefetch = 2
@@ -134,12 +140,7 @@ def test_basic_eval_step(testobj):
         model.dtype,
         train=False,
     )
-    # Evaluation is configured as parallel operation
     state = jax_utils.replicate(state)
-    p_eval_step = jax.pmap(
-        functools.partial(eval_step, criterion=criterion, metrics_fn=compute_metrics),
-        axis_name="batch",
-    )
 
     try:
         batch = next(eval_dt_iter)
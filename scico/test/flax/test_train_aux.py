@@ -24,6 +24,14 @@ def testobj():
     yield SetupTest()
 
 
+@jax.jit
+def mean_tree(t):
+    return jax.tree_util.tree_map(lambda x: jax.numpy.mean(x), t)
+
+
+p_eval = jax.pmap(compute_metrics, axis_name="batch")
+
+
 def test_mse_loss():
     N = 256
     x, key = random.randn((N, N), seed=4321)
@@ -53,17 +61,13 @@ def test_dstrain(testobj, local_batch):
         local_batch,
     )
 
-    nproc = jax.device_count()
-    ll = []
     num_steps = 40
-    for step, batch in zip(range(num_steps), train_iter):
-        for j in range(nproc):
-            ll.append(batch["image"][j])
+    batches = [batch["image"] for step, batch in zip(range(num_steps), train_iter)]
 
-    ll_ = np.array(jax.device_get(ll)).flatten()
-    ll_ar = np.array(list(set(np.sort(ll_))))
+    ll_ = np.asarray(jax.device_get(jax.numpy.stack(batches))).ravel()
+    ll_ar = np.unique(ll_).astype(np.int32)
 
-    np.testing.assert_allclose(ll_ar, np.arange(80))
+    np.testing.assert_allclose(ll_ar, np.arange(80, dtype=np.int32))
 
 
 @pytest.mark.parametrize("local_batch", [8, 16, 32])
@@ -73,17 +77,13 @@ def test_dstest(testobj, local_batch):
 
     train_iter = sflax.create_input_iter(key, testobj.test_ds_simple, local_batch, train=False)
 
-    nproc = jax.device_count()
-    ll = []
     num_steps = 20
-    for step, batch in zip(range(num_steps), train_iter):
-        for j in range(nproc):
-            ll.append(batch["image"][j])
+    batches = [batch["image"] for step, batch in zip(range(num_steps), train_iter)]
 
-    ll_ = np.array(jax.device_get(ll)).flatten()
-    ll_ar = np.array(list(set(np.sort(ll_))))
+    ll_ = np.asarray(jax.device_get(jax.numpy.stack(batches))).ravel()
+    ll_ar = np.unique(ll_).astype(np.int32)
 
-    np.testing.assert_allclose(ll_ar, np.arange(80, 112))
+    np.testing.assert_allclose(ll_ar, np.arange(80, 112, dtype=np.int32))
 
 
 def test_prepare_data(testobj):
@@ -99,9 +99,8 @@ def test_compute_metrics(testobj):
     xbtch = xbtch / jax.numpy.sqrt(jax.numpy.var(xbtch, axis=(1, 2, 3, 4)))
     ybtch = xbtch + 1
 
-    p_eval = jax.pmap(compute_metrics, axis_name="batch")
     eval_metrics = p_eval(ybtch, xbtch)
-    mtrcs = jax.tree_util.tree_map(lambda x: x.mean(), eval_metrics)
+    mtrcs = jax.device_get(mean_tree(eval_metrics))
     assert np.abs(mtrcs["loss"]) < 0.51
     assert mtrcs["snr"] < 5e-4
 
@@ -1,3 +1,6 @@
+import gc
+import weakref
+
 import numpy as np
 
 import jax
@@ -11,6 +14,8 @@ from scico.test.linop.test_linop import adjoint_test
 from scico.test.linop.test_radon_svmbir import make_im
 
 try:
+    import astra
+
     from scico.linop.radon_astra import TomographicProjector
 except ModuleNotFoundError as e:
     if e.name == "astra":
@@ -127,3 +132,180 @@ def test_jit_in_DiagonalStack():
     N = 10
     H = DiagonalStack([TomographicProjector((N, N), 1.0, N, snp.linspace(0, snp.pi, N))])
     H.T @ snp.zeros(H.output_shape, dtype=snp.float32)
+
+
+def test_fbp(testobj):
+    A = testobj.A
+    x = make_im(A.input_shape[0], A.input_shape[1], is_3d=False)
+    y = A @ x
+    x0 = A.fbp(y)
+    np.testing.assert_allclose(A.fbp(y), x0)
+    x1 = A.fbp(y, filter_type="hann")
+    assert np.linalg.norm(x1 - x0) > 0
+    np.testing.assert_allclose(A.fbp(y), x0)
+    assert np.linalg.norm(x0 - x) / np.linalg.norm(x) < 0.5
+
+
+def test_fbp_iir(testobj):
+    A = testobj.A
+    x = make_im(A.input_shape[0], A.input_shape[1], is_3d=False)
+    y = A @ x
+    x0 = A.fbp(y)
+    x1 = A.fbp(y, filter_type="Ram-Lak-IIR")
+    assert np.linalg.norm(x1 - x0) / np.linalg.norm(x0) < 2e-2
+
+
+def test_3d():
+    N = 16
+    N_slices = 3
+    angles = np.linspace(0, np.pi, 20, False)
+    A2 = TomographicProjector((N, N), 1.0, N, angles)
+    A3 = TomographicProjector((N_slices, N, N), 1.0, N, angles)
+    assert A3.output_shape == (N_slices, len(angles), N)
+    np.random.seed(1234)
+    x = np.random.randn(N_slices, N, N).astype(np.float32)
+    y = A3 @ x
+    rel_err = lambda a, b: np.linalg.norm(a - b) / np.linalg.norm(b)
+    assert rel_err(y, np.stack([A2 @ x[k] for k in range(N_slices)])) < get_tol()
+    assert rel_err(A3.T @ y, np.stack([A2.T @ y[k] for k in range(N_slices)])) < get_tol()
+    assert rel_err(A3.fbp(y), np.stack([A2.fbp(y[k]) for k in range(N_slices)])) < get_tol()
+    adjoint_test(A3, rtol=get_tol_random_input())
+
+
+@pytest.mark.parametrize("input_shape", [(N, N), (3, N, N)])
+def test_batch_apply(input_shape):
+    angles = np.linspace(0, np.pi, 45, False)
+    A = TomographicProjector(input_shape, 1.0, 192, angles)
+    xs = np.random.randn(4, *input_shape).astype(np.float32)
+    ys = A.batch_apply(xs)
+    assert ys.shape == (4,) + A.output_shape
+    ys_ref = snp.stack([A @ x for x in xs])
+    np.testing.assert_allclose(ys, ys_ref, rtol=get_tol())
+    ys_jit = jax.jit(A.batch_apply)(xs)
+    np.testing.assert_allclose(ys_jit, ys_ref, rtol=get_tol())
+    with pytest.raises(ValueError):
+        A.batch_apply(xs[..., :-1])
+
+
+def test_geometry_cache():
+    N = 16
+    angles = np.linspace(0, np.pi, 20, False)
+    A0 = TomographicProjector((N, N), 1.0, N, angles)
+    A1 = TomographicProjector((N, N), 1.0, N, angles.copy())
+    A2 = TomographicProjector((N, N), 1.0, N, angles[1:])
+    assert A0.proj_geom is A1.proj_geom
+    assert A0.vol_geom is A1.vol_geom
+    assert A0.proj_geom is not A2.proj_geom
+    np.testing.assert_allclose(A2.proj_geom["ProjectionAngles"], angles[1:])
+    A3 = TomographicProjector((N, N), snp.array(1.0), np.array(N), angles)
+    assert A3.proj_geom is A0.proj_geom
+
+
+def test_projector_cache():
+    from scico.linop.radon_astra import _PROJECTOR_CACHE
+
+    def num_users(proj_id):
+        return sum([v[1] for v in _PROJECTOR_CACHE.values() if v[0] == proj_id])
+
+    N = 17
+    angles = np.linspace(0, np.pi, 20, False)
+    A0 = TomographicProjector((N, N), 1.0, N, angles)
+    A1 = TomographicProjector((N, N), 1.0, N, angles)
+    A2 = TomographicProjector((N, N), 2.0, N, angles)
+    assert A0.proj_id == A1.proj_id
+    assert A0.proj_id != A2.proj_id
+    proj_id = A1.proj_id
+    assert num_users(proj_id) == 2
+    del A0
+    gc.collect()
+    assert num_users(proj_id) == 1
+    x = np.random.randn(N, N).astype(np.float32)
+    np.testing.assert_allclose(A1 @ x, astra.create_sino(x, proj_id)[1])
+    proj_id = A2.proj_id
+    del A2
+    gc.collect()
+    assert num_users(proj_id) == 0
+
+
+def test_release_after_use():
+    from scico.linop.radon_astra import _PROJECTOR_CACHE
+
+    N = 19
+    angles = np.linspace(0, np.pi, 20, False)
+    A = TomographicProjector((N, N), 1.0, N, angles)
+    key = A._astra_objs["projector_keys"][0]
+    ctx = A._proj_ctx
+    x = np.random.randn(N, N).astype(np.float32)
+    y = A @ x
+    A.T @ y
+    jax.grad(lambda x: snp.sum(A @ x))(x)
+    A.fbp(y)
+    A.fbp(y, filter_type="Ram-Lak-IIR")
+    fbp_ctx = A._fbp_ctx
+    buf_refs = [weakref.ref(A._vol_buf), weakref.ref(A._sino_buf)]
+    ref = weakref.ref(A)
+    del A
+    gc.collect()
+    assert ref() is None
+    assert key not in _PROJECTOR_CACHE
+    assert all([r() is None for r in buf_refs])
+    for data_id in (ctx["vol_id"], ctx["sino_id"]):
+        with pytest.raises(astra.log.AstraError):
+            astra.data2d.get(data_id)
+    for data_id in (fbp_ctx["sino_id"], fbp_ctx["rec_id"]):
+        with pytest.raises(astra.log.AstraError):
+            astra.data2d.get(data_id)
+    for alg_id in (ctx["fp_alg_id"], ctx["bp_alg_id"], fbp_ctx["alg_id"]):
+        with pytest.raises(astra.log.AstraError):
+            astra.algorithm.run(alg_id)
+
+
+def test_callback_reuse(monkeypatch):
+    from scico.linop import radon_astra
+
+    traced = []
+    host_callback = radon_astra._host_callback
+
+    def host_callback_count(ref, method, *args, **kwargs):
+        traced.append(method)
+        return host_callback(ref, method, *args, **kwargs)
+
+    monkeypatch.setattr(radon_astra, "_host_callback", host_callback_count)
+    N = 16
+    angles = np.linspace(0, np.pi, 10, False)
+    A = TomographicProjector((N, N), 1.0, N, angles)
+    x = np.random.randn(N, N).astype(np.float32)
+    for _ in range(3):
+        y = A @ x
+        A.fbp(y)
+    # The callbacks for projection and FBP are each traced only once
+    assert sorted(traced) == ["_fbp_host", "_proj_host"]
+
+
+def test_release_during_acquire(monkeypatch):
+    # A projector that is only freed by the cyclic garbage collector,
+    # collected while the projector cache lock is held, must not deadlock
+    import threading
+
+    from scico.linop.radon_astra import _PROJECTOR_CACHE
+
+    N = 21
+    angles = np.linspace(0, np.pi, 20, False)
+    A = TomographicProjector((N, N), 1.0, N, angles)
+    key = A._astra_objs["projector_keys"][0]
+    del A
+
+    create_projector = astra.create_projector
+
+    def create_projector_gc(*args):
+        gc.collect()
+        return create_projector(*args)
+
+    monkeypatch.setattr(astra, "create_projector", create_projector_gc)
+    thread = threading.Thread(
+        target=TomographicProjector, args=((N, N), 2.0, N, angles), daemon=True
+    )
+    thread.start()
+    thread.join(timeout=20)
+    assert not thread.is_alive()
+    assert key not in _PROJECTOR_CACHE